@@ -0,0 +1,233 @@
+import bpy
+import json
+import os
+from .utils import log
+
+# Merge strategies of RingFactory: join everything and merge once, or merge every ring on its own
+STRATEGIES = ("vector", "per_ring")
+# Timed series: one per strategy, plus joining the chunks (w is the number of chunks)
+SERIES = STRATEGIES + ("join",)
+CHUNK_SIZES = (16, 32, 64, 128, 256)
+
+# Unit of the stored work, timings measured in another unit are discarded
+WORK_UNIT = "text_objects"
+# Strategy used until every strategy has been measured on this machine
+DEFAULT_STRATEGY = "per_ring"
+# Distinct chunk sizes (in work) measured before a strategy's polynomial is fit
+MIN_SAMPLES = 3
+MAX_SAMPLES = 64
+# Jobs up to this many rings are used to measure strategies which lack samples
+CALIBRATION_RINGS = 64
+# A smaller chunk size has to be predicted this much faster to be picked over a larger one
+CHUNK_MARGIN = 0.01
+
+def default_path():
+    """
+    File storing the timings, None if Blender's config directory isn't available.
+    """
+    try:
+        try:
+            directory = bpy.utils.user_resource('CONFIG', "ring_ruler", autocreate=True)
+        except TypeError:
+            # Blender 3.0 renamed autocreate to create
+            directory = bpy.utils.user_resource('CONFIG', path="ring_ruler", create=True)
+    except (TypeError, ValueError, OSError):
+        return None
+    if not directory:
+        return None
+    return os.path.join(directory, "cost_model.json")
+
+def solve(a, b):
+    """
+    Solves a x = b for a small square system, returns None if a is singular.
+    """
+    n = len(b)
+    m = [list(row) + [v] for row, v in zip(a, b)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-12:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col:
+                f = m[r][col]/m[col][col]
+                m[r] = [x - f*y for x, y in zip(m[r], m[col])]
+    return [m[i][n]/m[i][i] for i in range(n)]
+
+def fit_terms(samples, terms):
+    """
+    Least squares fit of t = sum(c_k * w^k for k in terms), returns the c_k or None if undetermined.
+    """
+    n = len(terms)
+    a = [[0.0]*n for _ in range(n)]
+    b = [0.0]*n
+    for w, t in samples:
+        powers = [w**k for k in terms]
+        for i in range(n):
+            b[i] += powers[i]*t
+            for j in range(n):
+                a[i][j] += powers[i]*powers[j]
+    return solve(a, b)
+
+def better(t, chunk_size, best):
+    """
+    Whether a predicted time t beats best = (time, strategy, chunk size), near ties go to the larger chunk.
+    """
+    if best is None:
+        return True
+    best_t, _, best_chunk_size = best
+    if chunk_size < best_chunk_size:
+        return t < best_t*(1 - CHUNK_MARGIN)
+    if chunk_size > best_chunk_size:
+        return t < best_t*(1 + CHUNK_MARGIN)
+    return t < best_t
+
+class CostModel:
+    """
+    Predicts how long RingFactory takes per chunk with each merge strategy,
+    as c0 + c1*w + c2*w^2 seconds with w the work of the chunk: the number of text objects converted and merged.
+    Their REMESH and CURVE evaluation dominates and doesn't depend on the number of characters.
+    Joining the chunks at the end is fit the same way, with w the number of chunks.
+
+    Timings of every run are stored, the model is refit from them on the next run.
+    """
+    @classmethod
+    def load(cls, path=None):
+        """
+        Reads the stored timings, without a config directory the model only lives in memory.
+        """
+        if path is None:
+            path = default_path()
+        if path is None:
+            log("No config directory, timings of this run won't be stored")
+            return cls(None, {})
+        samples = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    stored = json.load(f)
+                if stored.get("work") != WORK_UNIT:
+                    raise KeyError("work")
+                stored = stored["samples"]
+                # The file may be stale or edited by hand, only take well formed samples
+                samples = {s: [[float(w), float(t)] for w, t in stored.get(s, [])] for s in SERIES}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                log(f"Ignoring unreadable cost model {path}")
+                samples = {}
+        return cls(path, samples)
+
+    def __init__(self, path, samples):
+        self.path = path
+        self.samples = {s: list(samples.get(s, [])) for s in SERIES}
+        self.coefficients = {s: self.fit(s) for s in SERIES}
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"work": WORK_UNIT, "samples": self.samples}, f)
+        except OSError:
+            log(f"Could not store cost model {self.path}")
+
+    def record(self, strategy, work, seconds):
+        samples = self.samples[strategy]
+        samples.append([work, seconds])
+        del samples[:-MAX_SAMPLES]
+        self.coefficients[strategy] = self.fit(strategy)
+
+    def calibrated(self, strategy):
+        return len(set(w for w, _ in self.samples[strategy])) >= MIN_SAMPLES
+
+    def fit(self, strategy):
+        """
+        Non-negative least squares fit of the chunk time polynomial, None while samples are lacking.
+
+        Terms which come out negative (or can't be determined) are dropped and the rest is fit again,
+        a time of c0 alone is the mean and never negative.
+        """
+        samples = self.samples[strategy]
+        if not self.calibrated(strategy):
+            return None
+
+        # Normalize work to keep the normal equations well conditioned
+        scale = max(w for w, _ in samples)
+        terms = [0, 1, 2]
+        while True:
+            c = fit_terms([(w/scale, t) for w, t in samples], terms)
+            if c is None:
+                terms.pop()
+                continue
+            negative = [(v, k) for v, k in zip(c, terms) if v < 0]
+            if not negative:
+                break
+            terms.remove(min(negative)[1])
+
+        coefficients = [0.0]*3
+        for v, k in zip(c, terms):
+            coefficients[k] = v/scale**k
+        return tuple(coefficients)
+
+    def calibration_chunk_size(self, series, rings, work):
+        """
+        Largest chunk size whose work (work(chunk_size)) hasn't been measured for series yet,
+        so repeated jobs still yield new samples.
+        """
+        seen = set(w for w, _ in self.samples[series])
+        for c in range(max(rings, 1), 0, -1):
+            if work(c) not in seen:
+                return c
+        return max(rings, 1)
+
+    def predict(self, strategy, rings, objects_per_ring, chunk_size):
+        c0, c1, c2 = self.coefficients[strategy]
+        total = 0.0
+        for begin in range(0, rings, chunk_size):
+            w = min(chunk_size, rings - begin)*objects_per_ring
+            total += c0 + c1*w + c2*w*w
+
+        if self.coefficients["join"] is None:
+            # Not measured yet, plan only considers a single chunk then
+            return total
+        c0, c1, c2 = self.coefficients["join"]
+        chunks = -(-rings//chunk_size)
+        return total + c0 + c1*chunks + c2*chunks*chunks
+
+    def plan(self, rings, objects_per_ring):
+        """
+        Returns the (strategy, chunk_size) with the lowest predicted time for the job.
+
+        While a strategy lacks samples, small jobs are used to measure it and large jobs
+        are built with the default strategy in a single chunk. Jobs are only split into chunks
+        once joining them has been measured, among near ties the larger chunk size wins.
+        """
+        lacking = [s for s in STRATEGIES if not self.calibrated(s)]
+        if lacking and rings <= CALIBRATION_RINGS:
+            # Take turns between the strategies we know least about
+            strategy = min(lacking, key=lambda s: len(self.samples[s]))
+            chunk_size = self.calibration_chunk_size(strategy, rings, lambda c: c*objects_per_ring)
+            log(f"Cost model measures {strategy} merge in chunks of {chunk_size} rings")
+            return strategy, chunk_size
+        if lacking:
+            log(f"Cost model isn't calibrated yet, using {DEFAULT_STRATEGY} merge")
+            return DEFAULT_STRATEGY, max(rings, 1)
+        if not self.calibrated("join") and 1 < rings <= CALIBRATION_RINGS:
+            # Measure joining with a number of chunks we haven't seen yet
+            chunk_size = self.calibration_chunk_size("join", rings, lambda c: -(-rings//c))
+            strategy = min(STRATEGIES, key=lambda s: self.predict(s, rings, objects_per_ring, chunk_size))
+            log(f"Cost model measures joining {strategy} merge in chunks of {chunk_size} rings")
+            return strategy, chunk_size
+
+        chunk_sizes = [max(rings, 1)]
+        if self.calibrated("join"):
+            chunk_sizes += [c for c in reversed(CHUNK_SIZES) if c < rings]
+        best = None
+        for s in STRATEGIES:
+            for c in chunk_sizes:
+                t = self.predict(s, rings, objects_per_ring, c)
+                if better(t, c, best):
+                    best = (t, s, c)
+
+        t, strategy, chunk_size = best
+        log(f"Cost model picks {strategy} merge in chunks of {chunk_size} rings, predicted {t:.1f}s")
+        return strategy, chunk_size
@@ -0,0 +1,70 @@
+import bpy
+from .utils import log
+
+# bpy.data collections holding the datablocks created while building rings
+DATA_COLLECTIONS = ("objects", "meshes", "curves")
+
+class DatablockTracker:
+    """
+    Remembers every datablock created during a run, so intermediates can be removed in bulk.
+
+    Datablocks are remembered by pointer and looked up in bpy.data again when freeing:
+    operators like join free objects on their own and stale python references must not be touched.
+    """
+    def __init__(self):
+        self.pointers = set()
+        self.freed = {}
+
+    def track(self, ids):
+        for i in ids:
+            if i is not None:
+                self.pointers.add(i.as_pointer())
+
+    def lookup(self):
+        """
+        Returns all tracked datablocks which still exist.
+        """
+        found = []
+        for name in DATA_COLLECTIONS:
+            for i in getattr(bpy.data, name):
+                if i.as_pointer() in self.pointers:
+                    found.append(i)
+        return found
+
+    def release(self, stage, keep=None):
+        """
+        Removes tracked datablocks in one batch and logs what was freed.
+
+        keep=None: only datablocks without users are removed (intermediates of a finished stage).
+        Otherwise every tracked datablock is removed, except the ones in keep and the data of kept objects.
+        Returns the number of freed datablocks per type.
+        """
+        alive = self.lookup()
+        if keep is None:
+            doomed = [i for i in alive if i.users == 0]
+        else:
+            kept = set()
+            for i in keep:
+                kept.add(i.as_pointer())
+                if isinstance(i, bpy.types.Object):
+                    kept.add(i.data.as_pointer())
+            doomed = [i for i in alive if i.as_pointer() not in kept]
+
+        report = {}
+        for i in doomed:
+            kind = type(i).__name__
+            report[kind] = report.get(kind, 0) + 1
+            self.pointers.discard(i.as_pointer())
+            self.freed[kind] = self.freed.get(kind, 0) + 1
+
+        if doomed:
+            bpy.data.batch_remove(doomed)
+
+        log(f"Freed {len(doomed)} datablocks after {stage}{format_report(report)}")
+        return report
+
+def format_report(report):
+    if not report:
+        return ""
+    counts = ", ".join(f"{kind}: {n}" for kind, n in sorted(report.items()))
+    return f" ({counts})"
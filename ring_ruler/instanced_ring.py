@@ -1,5 +1,6 @@
 import bpy  
 import math
+import os
 from mathutils import Vector
 
 class RingPrototype:
@@ -59,11 +60,19 @@ class RingPrototype:
         self.bevel_depth = 0.0002
         self.font_regular = font_regular
         self.baked = False
+        self.instances = []
+        self.text_prefix = ""
+        self.text_suffix = ""
+        self.remesh_scales = {}
 
-    def bake(self, context):
+    def bake(self, context, instances):
+        """
+        Creates the shared geometry for instances, the rings which are going to be built from this prototype.
+        """
         if self.baked:
             return
         self.baked = True
+        self.instances = list(instances)
 
         text_location = self.location + self.text_offset
         year_location = self.location + self.year_offset
@@ -136,6 +145,7 @@ class RingPrototype:
 
         self.connect_objects(context)
         self.merge_objects(context)
+        self.hoist_constants(context)
         self.base = self.outside
         self.base.name = "RingBase"
 
@@ -178,8 +188,169 @@ class RingPrototype:
         assert "FINISHED" in r
         self.outside.select_set(False)
         
-        delete_objects = [self.inside]
-        bpy.ops.object.delete({"selected_objects": delete_objects})
+        # Remove the cutter together with its mesh, deleting the object alone would orphan the mesh
+        bpy.data.batch_remove([self.inside, self.inside.data])
+        self.inside = None
+
+    def split_text(self):
+        """
+        Splits the texts of all instances into a constant prefix and suffix around the variable part.
+        Cuts only happen at spaces, so no kerning spans two parts.
+        """
+        texts = [r.text for r in self.instances]
+        if len(set(texts)) < 2:
+            return "", ""
+
+        prefix = os.path.commonprefix(texts)
+        prefix = prefix[:prefix.rfind(" ")+1]
+        rests = [t[len(prefix):] for t in texts]
+        suffix = os.path.commonprefix([t[::-1] for t in rests])[::-1]
+        suffix = suffix[suffix.find(" "):] if " " in suffix else ""
+
+        if any(len(t) == 0 for t in rests) or any(len(t) == len(suffix) for t in rests):
+            # Some ring would be left without variable text
+            return "", ""
+        return prefix, suffix
+
+    def variable_text(self, text):
+        """
+        Part of text which isn't baked into the base.
+        """
+        return text[len(self.text_prefix):len(text)-len(self.text_suffix)]
+
+    def measure_texts(self, context, texts):
+        """
+        Layout of each text when set with the prototype's text settings, in the text object's
+        local units (font size included). Returns a dict text -> (advance, ink width, ink height).
+
+        For the advance a marker glyph is appended, so trailing spaces count and the marker's own width cancels out.
+        All texts are laid out in a single depsgraph evaluation.
+        """
+        marker = "|"
+        texts = sorted(set(t for t in texts if t))
+        objs = []
+        for body in [marker] + [t + marker for t in texts] + texts:
+            data = self.text_obj.data.copy()
+            data.body = body
+            data.offset_x = 0
+            obj = bpy.data.objects.new("Measure", data)
+            context.collection.objects.link(obj)
+            objs.append(obj)
+
+        depsgraph = context.evaluated_depsgraph_get()
+        boxes = [o.evaluated_get(depsgraph).bound_box for o in objs]
+        bpy.data.batch_remove(objs + [o.data for o in objs])
+
+        ends = [max(v[0] for v in box) for box in boxes[:len(texts)+1]]
+        inks = boxes[len(texts)+1:]
+        layout = {"": (0.0, 0.0, 0.0)}
+        for t, end, box in zip(texts, ends[1:], inks):
+            width = max(v[0] for v in box) - min(v[0] for v in box)
+            height = max(v[1] for v in box) - min(v[1] for v in box)
+            layout[t] = (end - ends[0], width, height)
+        return layout
+
+    def remesh_scale(self, part, full):
+        """
+        REMESH scale giving the part of a text the voxel size REMESH used on the full text.
+        REMESH fits its grid to the largest dimension of the object, part and full are (width, height).
+        """
+        scale = self.text_obj.modifiers["remesh"].scale
+        if max(part) == 0 or max(full) == 0:
+            return scale
+        return scale*max(part)/max(full)
+
+    def variable_remesh_scale(self, text):
+        return self.remesh_scales.get(text, self.text_obj.modifiers["remesh"].scale)
+
+    def add_text_part(self, context, body, offset, remesh_scale):
+        """
+        Copy of the generic text, showing body shifted by offset (local units, see measure_texts) along the ring.
+        """
+        obj = self.text_obj.copy()
+        obj.data = self.text_obj.data.copy() # deep copy
+        obj.data.body = body
+        # offset_x is given in multiples of the font size
+        obj.data.offset_x = offset/obj.data.size
+        obj.modifiers["remesh"].scale = remesh_scale
+        context.collection.objects.link(obj)
+        return obj
+
+    def hoist_constants(self, context):
+        """
+        Bakes geometry which is the same on all instances (year, text prefix and suffix) into the base.
+        Instances then only carry the variable part of their text.
+        """
+        constants = []
+        years = set(r.year for r in self.instances)
+        if len(years) == 1:
+            self.year_obj.data.body = years.pop()
+            constants.append(self.year_obj)
+
+        prefix, suffix = self.split_text()
+        if prefix or suffix:
+            fulls = sorted(set(r.text for r in self.instances))
+            middles = sorted(set(t[len(prefix):len(t)-len(suffix)] for t in fulls))
+            layout = self.measure_texts(context,
+                [prefix, suffix] + fulls + middles
+                + [prefix + m for m in middles] + [m + suffix for m in middles])
+            middle_ends = [layout[prefix + m][0] for m in middles]
+            if max(middle_ends) - min(middle_ends) > 1e-3*self.text_size:
+                # Variable parts differ in width, the suffix moves from ring to ring
+                suffix = ""
+
+            self.text_prefix = prefix
+            self.text_suffix = suffix
+            self.text_obj.data.offset_x = layout[prefix][0]/self.text_obj.data.size
+
+            # Keep the voxel size of the full texts, else short parts get a finer mesh than the rest
+            def ink(t):
+                return layout[t][1:]
+            for t in fulls:
+                self.remesh_scales[t] = self.remesh_scale(ink(self.variable_text(t)), ink(t))
+            # The constant parts are shared, fit them to the average full text
+            full = [sum(ink(t)[k] for t in fulls)/len(fulls) for k in range(2)]
+            if prefix:
+                constants.append(self.add_text_part(context, prefix, 0, self.remesh_scale(ink(prefix), full)))
+            if suffix:
+                constants.append(self.add_text_part(context, suffix, middle_ends[0], self.remesh_scale(ink(suffix), full)))
+
+        if not constants:
+            return
+
+        # Evaluate all constant parts once and join them into the ring
+        bpy.ops.object.select_all(action='DESELECT')
+        texts = [obj.data for obj in constants]
+        for obj in constants:
+            obj.select_set(True)
+        context.view_layer.objects.active = constants[0]
+        r = bpy.ops.object.convert(target="MESH")
+        assert "FINISHED" in r
+        meshes = [obj.data for obj in constants]
+
+        all_objs = [self.outside] + constants
+        for obj in all_objs:
+            obj.select_set(True)
+        r = bpy.ops.object.join({"active_object": self.outside, "selected_objects": all_objs})
+        assert "FINISHED" in r
+        self.outside.select_set(False)
+
+        delete = [d for d in texts + meshes if d.users == 0]
+        if self.year_obj in constants:
+            delete.extend([self.year_curve, self.year_curve.data])
+            self.year_obj = None
+            self.year_curve = None
+        bpy.data.batch_remove(delete)
+
+    def get_datablocks(self):
+        """
+        Datablocks created by bake, these only live as long as the prototype is in use.
+        """
+        if not self.baked:
+            return []
+        objs = [self.base, self.curve, self.text_obj, self.year_curve, self.year_obj]
+        objs = [o for o in objs if o is not None]
+        return objs + [o.data for o in objs]
 
 
 class InstancedRing:
@@ -218,7 +389,7 @@ class InstancedRing:
         return self.prototype.bounding_box
 
     def create_objects(self, context):
-        self.prototype.bake(context)
+        assert self.prototype.baked, "Prototype has to be baked with all its rings first"
         text_location = self.location + self.prototype.text_offset
         year_location = self.location + self.prototype.year_offset
         
@@ -235,11 +406,22 @@ class InstancedRing:
 
         self.text_obj = self.prototype.text_obj.copy()
         self.text_obj.data = self.text_obj.data.copy() # deep copy
-        self.text_obj.data.body = self.text
+        self.text_obj.data.body = self.prototype.variable_text(self.text)
+        self.text_obj.modifiers["remesh"].scale = self.prototype.variable_remesh_scale(self.text)
         self.text_obj.location = text_location
         self.text_obj.modifiers["curve"].object = self.curve
 
         
+        context.collection.objects.link(self.base)
+        context.collection.objects.link(self.curve)
+        context.collection.objects.link(self.text_obj)
+
+        if self.prototype.year_obj is None:
+            # Year is baked into the base
+            self.year_curve = None
+            self.year_obj = None
+            return
+
         ## Add Year Text
         self.year_curve = self.prototype.year_curve.copy()
         self.year_curve.location = year_location
@@ -251,18 +433,17 @@ class InstancedRing:
         self.year_obj.location = year_location
         self.year_obj.modifiers["curve"].object = self.year_curve
 
-        context.collection.objects.link(self.base)
-        context.collection.objects.link(self.curve)
-        context.collection.objects.link(self.text_obj)
         context.collection.objects.link(self.year_curve)
         context.collection.objects.link(self.year_obj)
 
     def add_text_modifiers(self, context):
         return
         
-    def convert_to_mesh(self, context):
-        convert_text_to_mesh(context, self.text_obj)
-        convert_text_to_mesh(context, self.year_obj)
+    def get_convert_objects(self):
+        """
+        Text objects which have to be converted to meshes before merging.
+        """
+        return [o for o in [self.text_obj, self.year_obj] if o is not None]
 
     def get_base_object(self):
         return self.text_obj
@@ -271,16 +452,30 @@ class InstancedRing:
         return []
 
     def get_add_objects(self):
-        return [self.base, self.year_obj]
-
-def convert_text_to_mesh(context, text):
-        #me = self.text_obj.to_mesh()
-        #bpy.data.objects.new("text_mesh", me)
-        context.view_layer.objects.active = text
-        text.select_set(True)
-        bpy.ops.object.convert(target="MESH")
-        ## Check normals
-        # bpy.ops.mesh.normals_make_consistent()
-        # bpy.ops.mesh.print3d_clean_non_manifold()
-        text.select_set(False)
+        return [o for o in [self.base, self.year_obj] if o is not None]
+
+    def get_datablocks(self):
+        """
+        Datablocks owned by this ring.
+        The base mesh is shared with the prototype and is reported there.
+        """
+        objs = [self.curve, self.text_obj, self.year_curve, self.year_obj]
+        objs = [o for o in objs if o is not None]
+        return [self.base] + objs + [o.data for o in objs]
 
+    def get_prototype(self):
+        return self.prototype
+
+    def get_work(self):
+        """
+        Number of text objects built for this ring, constant parts are baked into the prototype.
+        """
+        if self.prototype.year_obj is not None:
+            return 2
+        return 1
+
+    def get_shared_datablocks(self):
+        """
+        Datablocks used by all rings of the prototype, needed until the last ring has been created.
+        """
+        return self.prototype.get_datablocks()
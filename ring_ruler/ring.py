@@ -101,13 +101,8 @@ class Ring:
         m.deform_axis = "NEG_X"
         m.object = self.curve
         
-    def convert_to_mesh(self, context):
-        # Crashes:
-        #override = context.copy()
-        #override["active_object"] = self.text_obj
-        context.view_layer.objects.active = self.text_obj
-        self.text_obj.select_set(True)
-        bpy.ops.object.convert(target="MESH")
+    def get_convert_objects(self):
+        return [self.text_obj]
 
     def get_base_object(self):
         return self.outside
@@ -118,6 +113,18 @@ class Ring:
     def get_add_objects(self):
         return [self.text_obj]
 
+    def get_datablocks(self):
+        return self.objects + [o.data for o in self.objects]
+
+    def get_prototype(self):
+        return None
+
+    def get_work(self):
+        return 1
+
+    def get_shared_datablocks(self):
+        return []
+
     def connect_objects(self, context):
         """
         Sets up any needed modifiers between objects but doesn't apply them.
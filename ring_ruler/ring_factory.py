@@ -1,5 +1,7 @@
 import bpy
 import bmesh
+import time
+from .datablocks import DatablockTracker
 from .utils import log
 
 def triangulate_object(obj):
@@ -15,18 +17,114 @@ def triangulate_object(obj):
     bm.to_mesh(me)
     bm.free()
 
+def convert_objects_to_mesh(context, objs):
+    """
+    Converts all objs with a single operator call, i.e. one depsgraph evaluation for all of them.
+    """
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objs:
+        obj.select_set(True)
+    context.view_layer.objects.active = objs[0]
+    r = bpy.ops.object.convert(target="MESH")
+    assert "FINISHED" in r
+    ## Check normals
+    # bpy.ops.mesh.normals_make_consistent()
+    # bpy.ops.mesh.print3d_clean_non_manifold()
+    for obj in objs:
+        obj.select_set(False)
+
 class RingFactory:
-    def __init__(self, vector_merge = True):
+    def __init__(self, vector_merge = True, chunk_size = 0, cost_model = None):
+        """
+        vector_merge: join all parts and merge them at once instead of merging ring by ring.
+        chunk_size: number of rings built together, 0 builds all rings at once.
+        cost_model: if given, picks vector_merge and chunk_size per job and learns from its timings.
+        """
         self.vector_merge = vector_merge
+        self.chunk_size = chunk_size
+        self.cost_model = cost_model
 
     def log(self, msg):
         log(msg)
 
     def create_rings(self, context, rings):
-        
+        if not rings:
+            self.log("No rings to create.")
+            return
+
+        tracker = DatablockTracker()
+        # Baked before any chunk is timed, the cost model only learns the per ring work
+        self.bake_prototypes(context, rings)
+        objects_per_ring = max(1, sum(r.get_work() for r in rings)//len(rings))
+
+        vector_merge = self.vector_merge
+        chunk_size = self.chunk_size or len(rings)
+        if self.cost_model is not None:
+            strategy, chunk_size = self.cost_model.plan(len(rings), objects_per_ring)
+            vector_merge = strategy == "vector"
+        strategy = "vector" if vector_merge else "per_ring"
+
+        bases = []
+        for begin in range(0, len(rings), chunk_size):
+            chunk = rings[begin:begin+chunk_size]
+            self.log(f"Chunk of rings [{begin}:{begin+len(chunk)}] ...")
+            start = time.perf_counter()
+            base = self.create_chunk(context, chunk, vector_merge, tracker, bases)
+            if self.cost_model is not None:
+                self.cost_model.record(strategy, len(chunk)*objects_per_ring, time.perf_counter() - start)
+            tracker.track([base, base.data])
+            bases.append(base)
+
+        start = time.perf_counter()
+        if len(bases) > 1:
+            self.log(f"Join {len(bases)} chunks ...")
+            base = self.join_objs(bases)
+        base.name = "rings"
+
+        # clean up: everything but the result is an intermediate (prototypes, joined chunks)
+        self.log("Delete objects ...")
+        tracker.release("clean up", keep=[base])
+        if self.cost_model is not None:
+            self.cost_model.record("join", len(bases), time.perf_counter() - start)
+
+        # Polish base
+        self.log("Polish rings ...")
+        triangulate_object(base)
+
+        if self.cost_model is not None:
+            self.cost_model.save()
+
+        freed = sum(tracker.freed.values())
+        self.log(f"Done, freed {freed} datablocks in total.")
+        context.view_layer.objects.active = None        
+
+    def bake_prototypes(self, context, rings):
+        """
+        Bakes the prototype of each ring with the final list of rings built from it.
+        """
+        prototypes = []
+        for r in rings:
+            p = r.get_prototype()
+            if p is not None and all(p is not q for q in prototypes):
+                prototypes.append(p)
+
+        if prototypes:
+            self.log(f"Bake {len(prototypes)} prototypes ...")
+        for p in prototypes:
+            p.bake(context, [r for r in rings if r.get_prototype() is p])
+
+    def create_chunk(self, context, rings, vector_merge, tracker, keep):
+        """
+        Builds rings into one object and removes their intermediates.
+        Datablocks in keep (results of earlier chunks) and the ones shared by rings are left alone.
+        """
         self.log("Creating rings ...")
+        shared = []
         for r in rings:
             r.create_objects(context)
+            tracker.track(r.get_datablocks())
+            shared.extend(r.get_shared_datablocks())
+        tracker.track(shared)
         
         context.view_layer.objects.active = None
         bpy.ops.object.select_all(action='DESELECT')
@@ -35,51 +133,47 @@ class RingFactory:
         for r in rings:
             r.add_text_modifiers(context)
         
-        self.log("Convert parts to mesh ...")
-        bpy.ops.object.select_all(action='DESELECT')
+        convert_objects = []
+        for r in rings:
+            convert_objects.extend(r.get_convert_objects())
+
+        self.log(f"Convert {len(convert_objects)} parts to mesh ...")
+        if convert_objects:
+            convert_objects_to_mesh(context, convert_objects)
+
+        # Conversion replaces the object data with new meshes
         for r in rings:
-            r.convert_to_mesh(context)
+            tracker.track(r.get_datablocks())
 
         context.view_layer.objects.active = None
         bpy.ops.object.select_all(action='DESELECT')
+        tracker.release("conversion")
 
-        if self.vector_merge:
+        if vector_merge:
             self.log("Join parts ...")
             parts = self.join_ring_objects(context, rings)
 
             self.log("Merge parts ...")
-            delete_objects = self.merge_ring_objects(context, parts["base"], parts["subtracts"], parts["adds"])
+            self.merge_ring_objects(context, parts["base"], parts["subtracts"], parts["adds"])
             base = parts["base"]
         else:
             self.log(f"Merge parts of {len(rings)} rings ...")
-            delete_objects = []
             bases = []
             for r in rings:
                 base = r.get_base_object()
                 subs = r.get_subtract_objects()
                 adds = r.get_add_objects()
-                ds = self.merge_ring_objects(context, base, subs, adds)
+                self.merge_ring_objects(context, base, subs, adds)
                 bases.append(base)
-                delete_objects.extend(ds)
 
             self.log("Join rings ...")
             base = self.join_objs(bases)
-            base.name = "rings"
 
-        # clean up
-        for r in rings:
-            delete_objects.append(r.curve)
-        
-        self.log("Delete objects ...")
-        bpy.ops.object.delete({"selected_objects": delete_objects})
-
-        # Polish base
-        self.log("Polish rings ...")
-        triangulate_object(base)
-
-        self.log("Done.")
-        context.view_layer.objects.active = None        
+        tracker.release("merge")
 
+        # Remove what's left of the rings (curves, cutters)
+        tracker.release("chunk", keep=keep + shared + [base])
+        return base
 
     def join_objs(self, objs):
         for b in objs:
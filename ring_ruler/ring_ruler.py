@@ -2,6 +2,7 @@ import bpy
 import datetime
 from mathutils import Vector
 
+from .cost_model import CostModel
 from .instanced_ring import InstancedRing, RingPrototype
 from .ring import Ring
 from .ring_factory import RingFactory
@@ -65,6 +66,11 @@ class RingRulerOperator(bpy.types.Operator):
     font_regular: bpy.props.EnumProperty(name="Font", items=font_enum_func)
     scale: bpy.props.FloatProperty(name="Scale", default=1000, min=0, max=999999)
     ring_height: bpy.props.FloatProperty(name="Height", default=8, min=0, max=20)
+    engine: bpy.props.EnumProperty(name="Engine", default="AUTO", items=[
+        ("AUTO", "Automatic", "Pick merge strategy and chunk size from timings measured on this machine"),
+        ("VECTOR", "Single merge", "Join the parts of all rings and merge them at once"),
+        ("PER_RING", "Per ring", "Merge the parts of every ring on its own"),
+    ])
 
     def log(self, msg):
         log(msg)
@@ -104,7 +110,10 @@ class RingRulerOperator(bpy.types.Operator):
         self.log("Arranging ring layout ...")
         arrange_in_plane(rings, self.scale*0.001*self.workspace_width, self.scale*0.001*self.workspace_height, self.scale*0.003)
 
-        rf = RingFactory(False)
+        if self.engine == "AUTO":
+            rf = RingFactory(cost_model=CostModel.load())
+        else:
+            rf = RingFactory(self.engine == "VECTOR")
         rf.create_rings(context, rings)
 
         return {'FINISHED'}            # Lets Blender know the operator finished successfully.